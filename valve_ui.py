@@ -11,24 +11,67 @@ import tkinter as tk
 from tkinter import messagebox, ttk
 import serial
 import serial.tools.list_ports
+import os
 import threading
-import queue
+import collections
+from functools import partial
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeout
+import re
+import sys
 import time
 
 
 class ValveController:
     """Thread-safe serial communication with background listener."""
 
-    def __init__(self):
+    RX_LINE_MAX = 256
+    ARDUINO_HINTS = (
+        "arduino",
+        "ch340",
+        "ch341",
+        "wch",
+        "cp210",
+        "ftdi",
+        "usb serial",
+        "usb-serial",
+    )
+    ARDUINO_HINT_RE = re.compile("|".join(map(re.escape, ARDUINO_HINTS)))
+    ARDUINO_VIDS = {0x2341, 0x2A03, 0x1A86, 0x10C4, 0x0403}
+    ARDUINO_OFFICIAL_VIDS = {0x2341, 0x2A03}
+    # Bridge chips found on Arduino clones; scored just below Arduino's own VIDs.
+    ARDUINO_VID_PIDS = {
+        (0x1A86, 0x7523): 4,  # CH340
+        (0x0403, 0x6001): 4,  # FTDI FT232R
+        (0x10C4, 0xEA60): 4,  # CP210x
+    }
+    BLUETOOTH_HINTS = ("bluetooth", "bthenum", "bthmodem")
+    RESPONSE_TAGS = frozenset(("OK", "STATE", "ERR"))
+    RESPONSE_PREFIXES = (b"OK:", b"STATE:", b"ERR:")
+    _CMD_BYTES = {"A": b"A", "B": b"B", "?": b"?"}
+    PORTS_CACHE_TTL = 2.0
+    LATENCY_TIMER_PATH = "/sys/bus/usb-serial/devices/{}/latency_timer"
+
+    _ports_cache = None
+    _ports_cache_ts = 0.0
+    _ports_cache_stamp = None
+    _ports_lock = threading.Lock()
+
+    def __init__(self, on_event=None):
         self.ser = None
+        self.on_event = on_event
         self.lock = threading.Lock()
         self.command_lock = threading.Lock()
-        self.response_queue = queue.Queue()
-        self.event_queue = queue.Queue()
+        self.response_queue = collections.deque()
+        self._response_ready = threading.Event()
+        self.event_queue = collections.deque()
         self._reader_thread = None
-        self._running = False
+        self._stop_evt = threading.Event()
+        self._rx_buf = bytearray()
+        self.low_latency = None
 
-    def connect(self, port, baudrate=9600, timeout=0.1, existing_ser=None):
+    def connect(self, port, baudrate=9600, timeout=None, existing_ser=None):
         with self.lock:
             if self.ser and self.ser.is_open:
                 self._stop_reader()
@@ -36,11 +79,20 @@ class ValveController:
             if existing_ser and existing_ser.is_open:
                 self.ser = existing_ser
                 self.ser.timeout = timeout
+                fresh = False
             else:
-                self.ser = serial.Serial(port, baudrate, timeout=timeout)
-                time.sleep(2)
+                self.ser = self.open_serial(port, baudrate, timeout)
+                fresh = True
+            self.low_latency = self.set_low_latency(self.ser)
             self.ser.reset_input_buffer()
+            self._rx_buf.clear()
+            self._clear_queues()
             self._start_reader()
+            if fresh:
+                # Opening the port resets the board; the sketch announces
+                # READY once it's up. Boards that don't reset never send it,
+                # so this falls back to the old fixed boot delay.
+                self._wait_ready(2.0)
 
     def disconnect(self):
         with self.lock:
@@ -51,135 +103,331 @@ class ValveController:
             self._clear_queues()
 
     def is_connected(self):
-        with self.lock:
-            return self.ser is not None and self.ser.is_open
+        # Lock-free: read self.ser once so a concurrent disconnect can't null
+        # it between the two checks.
+        ser = self.ser
+        return ser is not None and ser.is_open
 
     def send_command(self, cmd):
-        expected_prefix = "STATE:" if cmd == "?" else "OK:"
-
         with self.command_lock:
-            with self.lock:
-                if not self.ser or not self.ser.is_open:
-                    raise ConnectionError("Not connected")
-                self.ser.write(cmd.encode())
-
-            deadline = time.time() + 2.0
-            while time.time() < deadline:
-                try:
-                    line = self.response_queue.get(timeout=0.1)
-                except queue.Empty:
-                    continue
-
-                if line == "READY":
-                    continue
-
-                if line.startswith("ERR:"):
-                    return line
-                if line.startswith(expected_prefix):
-                    return line
-                if line.startswith(("OK:", "STATE:")):
+            self.write_command(cmd)
+            return self.read_response()
+
+    def write_command(self, cmd):
+        """Send a command without waiting for its reply (see read_response)."""
+        data = self._CMD_BYTES.get(cmd)
+        if data is None:
+            raise ValueError(f"Unknown command: {cmd!r}")
+        with self.lock:
+            if not self.ser or not self.ser.is_open:
+                raise ConnectionError("Not connected")
+            # Drop late replies to an earlier, timed-out command so they
+            # can't be taken as the answer to this one.
+            self.response_queue.clear()
+            self._response_ready.clear()
+            self.ser.write(data)
+
+    def read_response(self, timeout=2.0):
+        deadline = time.monotonic() + timeout
+        while True:
+            while self.response_queue:
+                line = self.response_queue.popleft()
+                tag, sep, _payload = line.partition(":")
+                if sep and tag in self.RESPONSE_TAGS:
                     return line
 
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            self._response_ready.wait(remaining)
+            self._response_ready.clear()
+
         raise TimeoutError("No response from Arduino")
 
+    def _wait_ready(self, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            while self.response_queue:
+                if self.response_queue.popleft() == "READY":
+                    return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            self._response_ready.wait(remaining)
+            self._response_ready.clear()
+
     def get_button_events(self):
         events = []
-        while True:
-            try:
-                events.append(self.event_queue.get_nowait())
-            except queue.Empty:
-                break
+        while self.event_queue:
+            events.append(self.event_queue.popleft())
         return events
 
     def _start_reader(self):
-        self._running = True
+        self._stop_evt.clear()
         self._reader_thread = threading.Thread(target=self._reader_loop, daemon=True)
         self._reader_thread.start()
 
     def _stop_reader(self):
-        self._running = False
+        self._stop_evt.set()
+        if self.ser:
+            try:
+                self.ser.cancel_read()
+            except Exception:
+                pass
         if self._reader_thread and self._reader_thread.is_alive():
             self._reader_thread.join(timeout=1)
         self._reader_thread = None
 
     def _reader_loop(self):
-        while self._running:
+        while not self._stop_evt.is_set():
             try:
                 if not self.ser or not self.ser.is_open:
                     break
-                raw = self.ser.readline()
-                if not raw:
-                    continue
-                line = raw.decode(errors="ignore").strip()
-                if not line:
+                # Sleep in the driver until the first byte arrives (the port has
+                # no timeout; _stop_reader cancels the read), then drain
+                # whatever else is waiting in the same call.
+                chunk = self.ser.read(self.ser.in_waiting or 1)
+                if not chunk:
                     continue
-
-                if line.startswith("BTN:"):
-                    self.event_queue.put(line.split(":")[1])
-                elif line.startswith(("OK:", "STATE:", "ERR:", "READY")):
-                    self.response_queue.put(line)
+                self._rx_buf.extend(chunk)
+                for line in self._pop_lines(self._rx_buf):
+                    self._handle_line(line)
+                if len(self._rx_buf) > self.RX_LINE_MAX:
+                    self._rx_buf.clear()
             except Exception:
-                if not self._running:
+                if self._stop_evt.is_set():
                     break
 
+    @staticmethod
+    def _pop_lines(buf):
+        """Remove complete lines from buf; return them as stripped bytearrays."""
+        lines = []
+        while True:
+            end = buf.find(b"\n")
+            if end < 0:
+                return lines
+            line = buf[:end].strip()
+            del buf[: end + 1]
+            if line:
+                lines.append(line)
+
+    def _handle_line(self, raw):
+        # Dispatch on the raw bytes; only lines that are kept get decoded.
+        if raw.startswith(b"BTN:"):
+            self.event_queue.append(raw[4:].decode("ascii", "ignore"))
+            if self.on_event:
+                self.on_event()
+        elif raw.startswith(self.RESPONSE_PREFIXES) or raw == b"READY":
+            self._put_response(raw.decode("ascii", "ignore"))
+
+    def _put_response(self, line):
+        self.response_queue.append(line)
+        self._response_ready.set()
+
     def _clear_queues(self):
-        for q in (self.response_queue, self.event_queue):
-            while not q.empty():
-                try:
-                    q.get_nowait()
-                except queue.Empty:
-                    break
+        self.event_queue.clear()
+        self.response_queue.clear()
+        self._response_ready.clear()
 
     @staticmethod
     def list_ports():
         return [p["device"] for p in ValveController.list_ports_with_details()]
 
+    @classmethod
+    def list_ports_with_details(cls, force=False):
+        """Return port details, reusing a recent enumeration unless forced.
+
+        comports() can take hundreds of ms on Windows, so back-to-back
+        callers within PORTS_CACHE_TTL share one result. Even a forced
+        refresh reuses it while the OS device list is unchanged.
+        """
+        with cls._ports_lock:
+            now = time.monotonic()
+            stamp = cls._ports_stamp()
+            if cls._ports_cache is not None and (
+                (stamp is not None and stamp == cls._ports_cache_stamp)
+                or (not force and now - cls._ports_cache_ts < cls.PORTS_CACHE_TTL)
+            ):
+                return list(cls._ports_cache)
+
+            details = cls._enumerate_ports()
+            cls._ports_cache = details
+            cls._ports_cache_ts = now
+            cls._ports_cache_stamp = stamp
+            return list(details)
+
     @staticmethod
-    def list_ports_with_details():
+    def _ports_stamp():
+        """Cheap fingerprint of attached serial devices, or None if unknown.
+
+        Linux: udev updates /dev/serial/by-id on every USB serial hotplug.
+        Windows: SERIALCOMM lists the currently present COM ports.
+        """
+        if sys.platform.startswith("linux"):
+            try:
+                return os.stat("/dev/serial/by-id").st_mtime_ns
+            except OSError:
+                return None
+        if os.name == "nt":
+            try:
+                import winreg
+
+                with winreg.OpenKey(
+                    winreg.HKEY_LOCAL_MACHINE, r"HARDWARE\DEVICEMAP\SERIALCOMM"
+                ) as key:
+                    count = winreg.QueryInfoKey(key)[1]
+                    return tuple(
+                        sorted(winreg.EnumValue(key, i)[:2] for i in range(count))
+                    )
+            except OSError:
+                return None
+        return None
+
+    @classmethod
+    def _enumerate_ports(cls):
         details = []
         for port in serial.tools.list_ports.comports():
-            details.append(
-                {
-                    "device": port.device,
-                    "description": port.description or "",
-                    "manufacturer": getattr(port, "manufacturer", "") or "",
-                    "product": getattr(port, "product", "") or "",
-                    "hwid": port.hwid or "",
-                    "vid": getattr(port, "vid", None),
-                    "pid": getattr(port, "pid", None),
-                }
-            )
+            info = {
+                "device": port.device,
+                "description": port.description or "",
+                "manufacturer": getattr(port, "manufacturer", "") or "",
+                "product": getattr(port, "product", "") or "",
+                "hwid": port.hwid or "",
+                "serial_number": getattr(port, "serial_number", "") or "",
+                "vid": getattr(port, "vid", None),
+                "pid": getattr(port, "pid", None),
+            }
+            info["score"] = cls.score_port(info)
+            info["bluetooth"] = cls.is_bluetooth(info)
+            details.append(info)
         details.sort(key=lambda item: item["device"])
         return details
 
+    @classmethod
+    def is_bluetooth(cls, info):
+        """Bluetooth serial ports can block for seconds when opened."""
+        text = f"{info.get('description', '')} {info.get('hwid', '')}".lower()
+        return any(hint in text for hint in cls.BLUETOOTH_HINTS)
+
+    @classmethod
+    def is_known_arduino(cls, info):
+        """True if the port carries one of Arduino's own USB vendor IDs.
+
+        Bridge chips (CH340, FTDI, CP210x) also sit on plain USB-serial
+        adapters, so they only rank high in score_port and need a probe.
+        """
+        return info.get("vid") in cls.ARDUINO_OFFICIAL_VIDS
+
+    @classmethod
+    def score_port(cls, info):
+        """Rate how likely a port is an Arduino from its USB descriptors."""
+        if cls.is_bluetooth(info):
+            # Never "likely": opening these can stall for seconds.
+            return -1
+        vid = info.get("vid")
+        if vid in cls.ARDUINO_OFFICIAL_VIDS:
+            # Arduino's own VIDs are conclusive: VID bonus + "arduino" hint.
+            return 5
+        score = cls.ARDUINO_VID_PIDS.get((vid, info.get("pid")))
+        if score is not None:
+            return score
+
+        text = " ".join(
+            [
+                info.get("description", ""),
+                info.get("manufacturer", ""),
+                info.get("product", ""),
+                info.get("hwid", ""),
+            ]
+        ).lower()
+        hits = set(cls.ARDUINO_HINT_RE.findall(text))
+        score = sum(3 if hint == "arduino" else 1 for hint in hits)
+        if vid in cls.ARDUINO_VIDS:
+            score += 2
+        return score
+
     @staticmethod
-    def probe_port(port, baudrate=9600):
+    def open_serial(port, baudrate, timeout):
+        """Open a port exclusively (POSIX) with a roomy driver buffer (Windows)."""
+        kwargs = {"exclusive": True} if os.name == "posix" else {}
+        ser = serial.Serial(port, baudrate, timeout=timeout, **kwargs)
+        if hasattr(ser, "set_buffer_size"):
+            try:
+                ser.set_buffer_size(rx_size=65536, tx_size=4096)
+            except Exception:
+                pass
+        return ser
+
+    @classmethod
+    def set_low_latency(cls, ser):
+        """Drop the USB-serial latency timer to 1 ms (Linux only, best effort).
+
+        Returns True if applied, False if the sysfs timer exists but isn't
+        writable, and None where there is no such timer (non-Linux, CH340,
+        CP210x, CDC/ttyACM boards).
+        """
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            ser.set_low_latency_mode(True)
+            return True
+        except (AttributeError, NotImplementedError, OSError, ValueError):
+            pass
+        path = cls.LATENCY_TIMER_PATH.format(os.path.basename(ser.port))
+        try:
+            with open(path, "w") as f:
+                f.write("1")
+            return True
+        except PermissionError:
+            return False
+        except OSError:
+            return None
+
+    @staticmethod
+    def probe_port(port, baudrate=9600, until=None):
         """Try a short handshake. Returns (matched, response_text, ser_or_None).
 
         On success the serial connection is kept open so the caller can
         hand it straight to connect() and avoid a second Arduino reset.
+        ``until`` is an optional time.monotonic() cutoff for the whole probe.
         """
         ser = None
         try:
-            ser = serial.Serial(port, baudrate, timeout=0.25)
-            time.sleep(1.8)
-            ser.reset_input_buffer()
-            ser.write(b"?")
-            deadline = time.time() + 1.5
-            saw_ready = False
-
-            while time.time() < deadline:
-                raw = ser.readline()
-                if not raw:
-                    continue
-                line = raw.decode(errors="ignore").strip()
-                if not line:
-                    continue
-                if line.startswith("STATE:"):
-                    return True, line, ser
-                if line.startswith("READY") and not saw_ready:
-                    saw_ready = True
+            ser = ValveController.open_serial(port, baudrate, 0.25)
+            # Probes are latency-bound too; the setting carries over if the
+            # port is handed to connect().
+            ValveController.set_low_latency(ser)
+            # Opening the port resets most boards; query as soon as the sketch
+            # reports READY. Boards that don't reset never send it, so fall
+            # back to querying once the usual boot time has passed.
+            boot_deadline = time.monotonic() + 2.0
+            deadline = boot_deadline + 1.5
+            if until is not None:
+                deadline = min(deadline, until)
+                # Still leave a board that doesn't reset time to answer.
+                boot_deadline = min(boot_deadline, until - 0.5)
+            queried = False
+            buf = bytearray()
+
+            while time.monotonic() < deadline:
+                if not queried and time.monotonic() >= boot_deadline:
+                    # Boot noise was already consumed below; only flush what
+                    # arrived since the last read.
+                    buf.clear()
+                    if ser.in_waiting:
+                        ser.reset_input_buffer()
                     ser.write(b"?")
+                    queried = True
+                buf.extend(ser.read(ser.in_waiting or 1))
+                for line in ValveController._pop_lines(buf):
+                    if line.startswith(b"STATE:"):
+                        return True, line.decode("ascii", "ignore"), ser
+                    if line.startswith(b"READY") and not queried:
+                        ser.write(b"?")
+                        queried = True
+                        deadline = time.monotonic() + 1.5
+                        if until is not None:
+                            deadline = min(deadline, until)
 
             if ser and ser.is_open:
                 try:
@@ -195,6 +443,51 @@ class ValveController:
                     pass
             return False, str(exc), None
 
+    @staticmethod
+    def probe_ports(ports, baudrate=9600, max_workers=8, timeout=5.0, until=None):
+        """Probe several ports concurrently. Returns (port, response, ser) or None.
+
+        Ports are submitted in the given order, so pass the likeliest first.
+        The first handshake to succeed wins; any serial handle opened by a
+        probe that finishes later is closed in the background. Probes stuck
+        opening a port (e.g. Bluetooth COM ports) are abandoned after timeout,
+        or at ``until`` (a time.monotonic() cutoff) if that comes first.
+        """
+        if not ports:
+            return None
+        if until is not None:
+            timeout = min(timeout, max(until - time.monotonic(), 0.0))
+
+        pool = ThreadPoolExecutor(max_workers=min(max_workers, len(ports)))
+        futures = {
+            pool.submit(ValveController.probe_port, port, baudrate, until): port
+            for port in ports
+        }
+        winner = None
+        try:
+            for future in as_completed(futures, timeout=timeout):
+                matched, response, ser = future.result()
+                if matched:
+                    winner = future
+                    return futures[future], response, ser
+            return None
+        except FuturesTimeout:
+            return None
+        finally:
+            for future in futures:
+                if future is not winner and not future.cancel():
+                    future.add_done_callback(ValveController._close_probe_result)
+            pool.shutdown(wait=False)
+
+    @staticmethod
+    def _close_probe_result(future):
+        _matched, _response, ser = future.result()
+        if ser and ser.is_open:
+            try:
+                ser.close()
+            except Exception:
+                pass
+
 
 class ValveApp(ctk.CTk):
     BASE_WIDTH = 920
@@ -204,65 +497,119 @@ class ValveApp(ctk.CTk):
     BASE_UI_SCALE = 0.95
     MIN_UI_SCALE = 0.85
     MAX_UI_SCALE = 1.08
+    DRAIN_BATCH = 32
+    STEP_RENDER_MS = 33
+    PROBE_FALLBACK_MAX = 8
+    SOLO_PROBE_MIN_SCORE = 4
+    DETECT_TIMEOUT = 6.0
     USER_ZOOM_MIN = 0.75
     USER_ZOOM_MAX = 1.60
     USER_ZOOM_STEP = 0.10
-
-    STATE_COLORS = {"A": "#60a5fa", "B": "#fb923c"}
+    SETTINGS_PATH = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "valve_ui_settings.json"
+    )
+
+    # state -> (banner title, title color)
+    STATE_VIEW = {"A": ("POSITION A", "#60a5fa"), "B": ("POSITION B", "#fb923c")}
+    STATE_LABELS = {
+        "A": "Position A  \u2014  P \u2192 A, B exhaust",
+        "B": "Position B  \u2014  P \u2192 B, A exhaust",
+    }
     STATE_BANNER_BG = {"A": "#1e3a5f", "B": "#431407"}
     BANNER_OFF_BG = "#1e293b"
+    SOURCE_LABELS = {
+        "button": "Changed via hardware buttons",
+        "ui": "Changed via UI",
+        "sequence": "Changed via sequence",
+        "sync": "Synced from controller",
+    }
 
     CARD = "#1e293b"
     CARD_BORDER = "#334155"
     TEXT_SEC = "#94a3b8"
     TEXT_MUTED = "#64748b"
 
-    ARDUINO_HINTS = ("arduino", "ch340", "wch", "cp210", "ftdi", "usb serial")
-    ARDUINO_VIDS = {0x2341, 0x2A03, 0x1A86, 0x10C4, 0x0403}
-
     def __init__(self):
-        super().__init__()
-
+        # Theme first so widgets are built with it instead of restyled.
         ctk.set_appearance_mode("dark")
         ctk.set_default_color_theme("blue")
+        super().__init__()
+        self._fonts = {}
 
         self.title("Airtec 4V120  -  Valve Controller")
         self.geometry(f"{self.BASE_WIDTH}x{self.BASE_HEIGHT}")
         self.minsize(self.MIN_WIDTH, self.MIN_HEIGHT)
         self.resizable(True, True)
         self._resize_job = None
+        self._zoom_job = None
+        self._last_resize_wh = (0, 0)
+        self._resize_wh = None
+        self._resize_deadline = 0.0
+        self._status_flash_job = None
+        self._status_before_flash = ""
+        self._text_cache = {}
+        self._state_cache = {}
+        self._connected = False
+        self._last_state_display = None
         self._fit_scale = self.BASE_UI_SCALE
         self._manual_zoom = 1.0
         self._ui_scale = self.BASE_UI_SCALE
         ctk.set_widget_scaling(self._ui_scale)
 
-        self.controller = ValveController()
+        self._drain_pending = False
+        self.controller = ValveController(on_event=self._notify_ui)
         self.current_state = "A"
         self.busy = False
         self.detecting = False
+        self.refreshing = False
 
-        self.result_queue = queue.Queue()
+        self.result_queue = collections.deque()
+        self._jobs = collections.deque()
+        self._job_ready = threading.Event()
+        threading.Thread(target=self._job_loop, name="valve-io", daemon=True).start()
         self.port_details_by_device = {}
+        self._port_info_cache = {}
 
         self.sequence_steps = []
+        self._seq_rows = []
         self.sequence_running = False
         self.sequence_stop_event = threading.Event()
         self.sequence_thread = None
         self.sequence_total_steps = 0
+        self._pending_step = None
+        self._step_render_job = None
+        self._sequence_interrupted = False
 
         self._probed_serial = None
         self._probed_port = None
-
+        self._closing = False
+        self.settings = self._load_settings()
+
+        # Set by _build_ui; event handlers compare against None instead of
+        # probing with hasattr() on every wheel tick.
+        self.page = None
+        self._page_canvas = None
+        self.seq_table = None
+        self.zoom_label = None
         self._build_ui()
         self._refresh_zoom_label()
         self.bind("<Configure>", self._on_window_resize)
         self._bind_zoom_shortcuts()
         self.bind_all("<MouseWheel>", self._on_page_mousewheel, add="+")
-        self.bind_all("<Button-4>", lambda _event: self._scroll_page(-1), add="+")
-        self.bind_all("<Button-5>", lambda _event: self._scroll_page(1), add="+")
+        self.bind_all("<Button-4>", self._on_page_scroll_up, add="+")
+        self.bind_all("<Button-5>", self._on_page_scroll_down, add="+")
         self._update_controls(connected=False)
-        self._poll_results()
-        self._poll_button_events()
+        # Workers can finish before mainloop() runs, when their after() call
+        # fails; this first drain runs once the loop is up and collects them.
+        self.after(0, self._drain_queues)
+
+    def _font(self, size, weight="normal"):
+        """Shared CTkFont per (size, weight) instead of a tuple per widget."""
+        font = self._fonts.get((size, weight))
+        if font is None:
+            font = ctk.CTkFont(family="Segoe UI", size=size, weight=weight)
+            self._fonts[(size, weight)] = font
+        return font
 
     def _card(self, parent, **kw):
         return ctk.CTkFrame(
@@ -278,7 +625,7 @@ class ValveApp(ctk.CTk):
         return ctk.CTkLabel(
             parent,
             text=text.upper(),
-            font=("Segoe UI", 10, "bold"),
+            font=self._font(10, "bold"),
             text_color=self.TEXT_MUTED,
             anchor="w",
         )
@@ -300,7 +647,7 @@ class ValveApp(ctk.CTk):
         ctk.CTkLabel(
             title_bar,
             text="Airtec 4V120 Valve Controller",
-            font=("Segoe UI", 14, "bold"),
+            font=self._font(14, "bold"),
             text_color="#e2e8f0",
         ).grid(row=0, column=0, padx=20, pady=10, sticky="w")
 
@@ -314,7 +661,7 @@ class ValveApp(ctk.CTk):
             height=26,
             corner_radius=6,
             command=self._zoom_out,
-            font=("Segoe UI", 13, "bold"),
+            font=self._font(13, "bold"),
             fg_color="#334155",
             hover_color="#475569",
         )
@@ -325,7 +672,7 @@ class ValveApp(ctk.CTk):
             text="100%",
             width=48,
             anchor="center",
-            font=("Segoe UI", 10),
+            font=self._font(10),
             text_color=self.TEXT_SEC,
         )
         self.zoom_label.grid(row=0, column=1, padx=2)
@@ -337,7 +684,7 @@ class ValveApp(ctk.CTk):
             height=26,
             corner_radius=6,
             command=self._zoom_in,
-            font=("Segoe UI", 13, "bold"),
+            font=self._font(13, "bold"),
             fg_color="#334155",
             hover_color="#475569",
         )
@@ -356,7 +703,7 @@ class ValveApp(ctk.CTk):
         self.state_label = ctk.CTkLabel(
             self.state_banner,
             text="DISCONNECTED",
-            font=("Segoe UI", 26, "bold"),
+            font=self._font(26, "bold"),
             text_color=self.TEXT_MUTED,
         )
         self.state_label.grid(row=0, column=0, pady=(14, 0))
@@ -364,7 +711,7 @@ class ValveApp(ctk.CTk):
         self.state_detail = ctk.CTkLabel(
             self.state_banner,
             text="Select a COM port and connect",
-            font=("Segoe UI", 12),
+            font=self._font(12),
             text_color=self.TEXT_SEC,
         )
         self.state_detail.grid(row=1, column=0, pady=(0, 2))
@@ -372,7 +719,7 @@ class ValveApp(ctk.CTk):
         self.source_label = ctk.CTkLabel(
             self.state_banner,
             text="",
-            font=("Segoe UI", 10),
+            font=self._font(10),
             text_color=self.TEXT_MUTED,
         )
         self.source_label.grid(row=2, column=0, pady=(0, 8))
@@ -384,6 +731,7 @@ class ValveApp(ctk.CTk):
             fg_color="transparent",
         )
         self.page.grid(row=1, column=0, sticky="nsew")
+        self._page_canvas = getattr(self.page, "_parent_canvas", None)
         self.page.grid_columnconfigure(0, weight=1)
         self.page.grid_rowconfigure(2, weight=1)
 
@@ -407,7 +755,7 @@ class ValveApp(ctk.CTk):
         ctk.CTkLabel(
             conn,
             text="COM Port",
-            font=("Segoe UI", 12),
+            font=self._font(12),
             text_color="#cbd5e1",
         ).grid(row=1, column=0, padx=(16, 8), pady=(4, 8), sticky="w")
 
@@ -418,7 +766,7 @@ class ValveApp(ctk.CTk):
             values=["No ports found"],
             command=self._on_port_selected,
             width=145,
-            font=("Segoe UI", 12),
+            font=self._font(12),
             corner_radius=8,
             fg_color="#334155",
             button_color="#475569",
@@ -434,7 +782,7 @@ class ValveApp(ctk.CTk):
             width=85,
             corner_radius=btn_r,
             command=self._refresh_ports,
-            font=("Segoe UI", 12),
+            font=self._font(12),
             fg_color="#334155",
             hover_color="#475569",
             text_color="#cbd5e1",
@@ -447,7 +795,7 @@ class ValveApp(ctk.CTk):
             width=125,
             corner_radius=btn_r,
             command=self._detect_arduino_port,
-            font=("Segoe UI", 12),
+            font=self._font(12),
             fg_color="#312e81",
             hover_color="#3730a3",
             text_color="#c7d2fe",
@@ -460,7 +808,7 @@ class ValveApp(ctk.CTk):
             width=110,
             corner_radius=btn_r,
             command=self._toggle_connection,
-            font=("Segoe UI", 12, "bold"),
+            font=self._font(12, "bold"),
             fg_color="#166534",
             hover_color="#15803d",
             text_color="#bbf7d0",
@@ -470,7 +818,7 @@ class ValveApp(ctk.CTk):
         self.port_info_label = ctk.CTkLabel(
             conn,
             text="Select a COM port to view USB details.",
-            font=("Segoe UI", 10),
+            font=self._font(10),
             text_color=self.TEXT_MUTED,
             anchor="w",
         )
@@ -486,19 +834,30 @@ class ValveApp(ctk.CTk):
         self.connected_port_label = ctk.CTkLabel(
             conn,
             text="Not connected",
-            font=("Segoe UI", 10, "bold"),
+            font=self._font(10, "bold"),
             text_color=self.TEXT_MUTED,
             anchor="w",
         )
         self.connected_port_label.grid(
             row=3,
             column=0,
-            columnspan=5,
+            columnspan=3,
             padx=16,
             pady=(0, 10),
             sticky="ew",
         )
 
+        self.scan_bt_var = tk.BooleanVar(value=False)
+        ctk.CTkCheckBox(
+            conn,
+            text="Scan Bluetooth ports too",
+            variable=self.scan_bt_var,
+            font=self._font(10),
+            text_color=self.TEXT_MUTED,
+            checkbox_width=16,
+            checkbox_height=16,
+        ).grid(row=3, column=3, columnspan=2, padx=(3, 16), pady=(0, 10), sticky="e")
+
         # ── Valve Control card ──
         ctrl = self._card(self.page)
         ctrl.grid(row=1, column=0, padx=pad_x, pady=gap, sticky="ew")
@@ -522,7 +881,7 @@ class ValveApp(ctk.CTk):
             width=95,
             corner_radius=btn_r,
             command=self._query_state,
-            font=("Segoe UI", 12),
+            font=self._font(12),
             fg_color="#334155",
             hover_color="#475569",
             text_color="#cbd5e1",
@@ -530,7 +889,7 @@ class ValveApp(ctk.CTk):
         self.read_state_btn.grid(row=0, column=1, sticky="e")
 
         btn_h = 66
-        btn_font = ("Segoe UI", 13, "bold")
+        btn_font = self._font(13, "bold")
 
         self.btn_a = ctk.CTkButton(
             ctrl,
@@ -540,7 +899,7 @@ class ValveApp(ctk.CTk):
             fg_color="#1d4ed8",
             hover_color="#2563eb",
             font=btn_font,
-            command=lambda: self._send("A"),
+            command=partial(self._send, "A"),
         )
         self.btn_a.grid(row=1, column=0, padx=(16, 5), pady=(6, 16), sticky="ew")
 
@@ -552,7 +911,7 @@ class ValveApp(ctk.CTk):
             fg_color="#c2410c",
             hover_color="#ea580c",
             font=btn_font,
-            command=lambda: self._send("B"),
+            command=partial(self._send, "B"),
         )
         self.btn_b.grid(row=1, column=1, padx=(5, 16), pady=(6, 16), sticky="ew")
 
@@ -576,7 +935,7 @@ class ValveApp(ctk.CTk):
         ctk.CTkLabel(
             editor,
             text="State",
-            font=("Segoe UI", 12),
+            font=self._font(12),
             text_color="#cbd5e1",
         ).grid(row=0, column=0, padx=(4, 6), pady=5)
 
@@ -587,7 +946,7 @@ class ValveApp(ctk.CTk):
             values=["A", "B"],
             width=70,
             corner_radius=8,
-            font=("Segoe UI", 12),
+            font=self._font(12),
             fg_color="#334155",
             button_color="#475569",
             button_hover_color="#64748b",
@@ -597,7 +956,7 @@ class ValveApp(ctk.CTk):
         ctk.CTkLabel(
             editor,
             text="Duration (s)",
-            font=("Segoe UI", 12),
+            font=self._font(12),
             text_color="#cbd5e1",
         ).grid(row=0, column=2, padx=(10, 6), pady=5)
 
@@ -607,14 +966,14 @@ class ValveApp(ctk.CTk):
             textvariable=self.seq_duration_var,
             width=75,
             corner_radius=8,
-            font=("Segoe UI", 12),
+            font=self._font(12),
             fg_color="#0f172a",
             border_color="#334155",
         )
         self.seq_duration_entry.grid(row=0, column=3, padx=3, pady=5)
 
         sb = lambda **k: ctk.CTkButton(
-            editor, corner_radius=btn_r, font=("Segoe UI", 11), **k
+            editor, corner_radius=btn_r, font=self._font(11), **k
         )
 
         self.seq_add_btn = sb(
@@ -743,7 +1102,7 @@ class ValveApp(ctk.CTk):
             width=70,
             corner_radius=btn_r,
             command=self._move_step_up,
-            font=("Segoe UI", 11),
+            font=self._font(11),
             fg_color="#334155",
             hover_color="#475569",
             text_color="#cbd5e1",
@@ -756,7 +1115,7 @@ class ValveApp(ctk.CTk):
             width=78,
             corner_radius=btn_r,
             command=self._move_step_down,
-            font=("Segoe UI", 11),
+            font=self._font(11),
             fg_color="#334155",
             hover_color="#475569",
             text_color="#cbd5e1",
@@ -771,8 +1130,8 @@ class ValveApp(ctk.CTk):
             text="\u25b6  Run Once",
             width=105,
             corner_radius=btn_r,
-            command=lambda: self._start_sequence(loop_mode=False),
-            font=("Segoe UI", 12, "bold"),
+            command=partial(self._start_sequence, loop_mode=False),
+            font=self._font(12, "bold"),
             fg_color="#1d4ed8",
             hover_color="#2563eb",
         )
@@ -783,8 +1142,8 @@ class ValveApp(ctk.CTk):
             text="\u21bb  Loop",
             width=88,
             corner_radius=btn_r,
-            command=lambda: self._start_sequence(loop_mode=True),
-            font=("Segoe UI", 12, "bold"),
+            command=partial(self._start_sequence, loop_mode=True),
+            font=self._font(12, "bold"),
             fg_color="#6d28d9",
             hover_color="#7c3aed",
         )
@@ -796,7 +1155,7 @@ class ValveApp(ctk.CTk):
             width=80,
             corner_radius=btn_r,
             command=self._stop_sequence,
-            font=("Segoe UI", 12, "bold"),
+            font=self._font(12, "bold"),
             fg_color="#991b1b",
             hover_color="#b91c1c",
         )
@@ -809,7 +1168,7 @@ class ValveApp(ctk.CTk):
         self.sequence_status = ctk.CTkLabel(
             bottom_bar,
             text="Sequence idle",
-            font=("Segoe UI", 10),
+            font=self._font(10),
             text_color=self.TEXT_MUTED,
             anchor="e",
         )
@@ -819,7 +1178,7 @@ class ValveApp(ctk.CTk):
         self.status_bar = ctk.CTkLabel(
             self,
             text="Ready  \u2502  Ctrl +/\u2212 zoom, Ctrl+0 reset",
-            font=("Segoe UI", 10),
+            font=self._font(10),
             text_color=self.TEXT_MUTED,
             anchor="w",
             height=24,
@@ -829,68 +1188,158 @@ class ValveApp(ctk.CTk):
         self._refresh_ports()
         self._refresh_sequence_table()
 
-    # Polling loops
-    def _poll_results(self):
+    # Worker hand-off
+    def _notify_ui(self):
+        """Ask the Tk thread for a queue drain (best effort from workers).
+
+        after() from another thread only works once mainloop() runs on a
+        threaded Tcl; results posted before that are collected by the drain
+        __init__ schedules.
+        """
+        if self._drain_pending:
+            return
+        self._drain_pending = True
         try:
-            while True:
-                callback = self.result_queue.get_nowait()
-                callback()
-        except queue.Empty:
-            pass
-        self.after(50, self._poll_results)
+            self.after(0, self._drain_queues)
+        except (RuntimeError, tk.TclError):
+            self._drain_pending = False
+
+    def _post(self, callback, *args):
+        self.result_queue.append((callback, args))
+        self._notify_ui()
+
+    def _drain_queues(self):
+        self._drain_pending = False
+        # Bounded batch so a burst of results can't hold off repaints; the
+        # rest is picked up on the next idle pass.
+        for _ in range(self.DRAIN_BATCH):
+            if not self.result_queue:
+                break
+            callback, args = self.result_queue.popleft()
+            callback(*args)
+        else:
+            if self.result_queue and not self._drain_pending:
+                self._drain_pending = True
+                self.after_idle(self._drain_queues)
+        self._handle_button_events()
 
-    def _poll_button_events(self):
-        if self.controller.is_connected():
-            events = self.controller.get_button_events()
-            for state in events:
-                if state in ("A", "B"):
-                    self.current_state = state
-                    self._show_state(state, source="button")
-                    if self.sequence_running:
-                        self.sequence_stop_event.set()
-                        self.sequence_status.configure(
-                            text="Sequence interrupted by hardware button input"
-                        )
-                        self.status_bar.configure(
-                            text=f"Hardware buttons changed valve to {state}; sequence stopping"
-                        )
-                    else:
-                        self.status_bar.configure(
-                            text=f"Hardware buttons changed valve to {state}"
-                        )
-        self.after(100, self._poll_button_events)
-
-    def _run_async(self, func, on_done):
-        def _worker():
+    def _handle_button_events(self):
+        if not self._connected:
+            return
+        # Only the last press of a burst matters; repaint the banner once.
+        events = self.controller.get_button_events()
+        states = [state for state in events if state in ("A", "B")]
+        if not states:
+            return
+
+        state = states[-1]
+        self.current_state = state
+        self._show_state(state, source="button")
+        if self.sequence_running:
+            # Steps still waiting to be painted are older than this press.
+            self._sequence_interrupted = True
+            self._drop_sequence_step()
+            self.sequence_stop_event.set()
+            self._set_text(
+                self.sequence_status,
+                text="Sequence interrupted by hardware button input",
+            )
+            self._set_text(
+                self.status_bar,
+                text=f"Hardware buttons changed valve to {state}; sequence stopping",
+            )
+        else:
+            self._set_text(
+                self.status_bar, text=f"Hardware buttons changed valve to {state}"
+            )
+
+    def _run_async(self, func, on_done=None):
+        # Without on_done the job is fire-and-forget and errors are dropped.
+        def _job():
             try:
-                result = func()
-                self.result_queue.put(lambda: on_done(result, None))
+                result, err = func(), None
             except Exception as exc:
-                err = exc
-                self.result_queue.put(lambda: on_done(None, err))
+                result, err = None, exc
+            if on_done is not None:
+                self._post(on_done, result, err)
 
-        threading.Thread(target=_worker, daemon=True).start()
+        self._jobs.append(_job)
+        self._job_ready.set()
+
+    def _job_loop(self):
+        # One long-lived worker runs every _run_async job in order.
+        while True:
+            self._job_ready.wait()
+            self._job_ready.clear()
+            while self._jobs:
+                job = self._jobs.popleft()
+                job()
 
     def _get_state_label(self, state):
-        return {
-            "A": "Position A  \u2014  P \u2192 A, B exhaust",
-            "B": "Position B  \u2014  P \u2192 B, A exhaust",
-        }.get(state, state)
+        return self.STATE_LABELS.get(state, state)
+
+    def _set_text(self, widget, text, **kwargs):
+        """configure(text=...) that skips the Tk call if nothing changed."""
+        value = (text, kwargs)
+        if self._text_cache.get(widget) != value:
+            widget.configure(text=text, **kwargs)
+            self._text_cache[widget] = value
+
+    def _set_state(self, widget, state):
+        """configure(state=...) that skips the Tk call if nothing changed."""
+        if self._state_cache.get(widget) != state:
+            widget.configure(state=state)
+            self._state_cache[widget] = state
+
+    def _flash_status(self, msg, color="#fbbf24", ms=3000):
+        """Show a non-modal warning in the status bar, then restore it."""
+        if self._status_flash_job is not None:
+            self.after_cancel(self._status_flash_job)
+        else:
+            self._status_before_flash = self.status_bar.cget("text")
+        self._set_text(self.status_bar, text=msg, text_color=color)
+        self._status_flash_job = self.after(ms, self._restore_status, msg)
+
+    def _restore_status(self, msg):
+        self._status_flash_job = None
+        text = self.status_bar.cget("text")
+        if text == msg:
+            text = self._status_before_flash
+        self._set_text(self.status_bar, text, text_color=self.TEXT_MUTED)
 
     # COM port helpers
     def _on_port_selected(self, _value=None):
         self._update_port_details()
 
     def _refresh_ports(self):
-        details = ValveController.list_ports_with_details()
+        # comports() can block for a while on Windows; keep it off the Tk thread.
+        if self.refreshing:
+            return
+        self.refreshing = True
+        self._set_state(self.refresh_btn, "disabled")
+
+        self._run_async(
+            partial(ValveController.list_ports_with_details, force=True),
+            self._refresh_done,
+        )
+
+    def _refresh_done(self, details, err):
+        self.refreshing = False
+        self._update_controls(connected=self._connected)
+        if err:
+            self._set_text(self.status_bar, text=f"Port refresh failed: {err}")
+            return
         self._apply_port_details(details)
         if details:
-            self.status_bar.configure(text=f"Found {len(details)} serial port(s)")
+            self._set_text(self.status_bar, text=f"Found {len(details)} serial port(s)")
         else:
-            self.status_bar.configure(text="No serial ports found")
+            self._set_text(self.status_bar, text="No serial ports found")
 
     def _apply_port_details(self, details):
         self.port_details_by_device = {item["device"]: item for item in details}
+        self._port_info_cache = {
+            item["device"]: self._format_port_info(item) for item in details
+        }
         ports = [item["device"] for item in details]
         current = self.port_var.get()
 
@@ -905,134 +1354,231 @@ class ValveApp(ctk.CTk):
         self._update_port_details()
 
     def _score_port(self, info):
-        text = " ".join(
-            [
-                info.get("description", ""),
-                info.get("manufacturer", ""),
-                info.get("product", ""),
-                info.get("hwid", ""),
-            ]
-        ).lower()
-        score = 0
-        for hint in self.ARDUINO_HINTS:
-            if hint in text:
-                score += 3 if hint == "arduino" else 1
-        if info.get("vid") in self.ARDUINO_VIDS:
-            score += 2
+        score = info.get("score")
+        if score is None:
+            score = ValveController.score_port(info)
         return score
 
-    def _update_port_details(self):
-        device = self.port_var.get()
-        info = self.port_details_by_device.get(device)
-        if not info:
-            self.port_info_label.configure(
-                text="Select a COM port to view USB details.",
-                text_color="#A0A0A0",
-            )
-            return
-
+    def _format_port_info(self, info):
         description = info.get("description") or "Unknown device"
         manufacturer = info.get("manufacturer") or "Unknown manufacturer"
-        hwid = (info.get("hwid") or "").strip()
-        if len(hwid) > 70:
-            hwid = hwid[:67] + "..."
         score = self._score_port(info)
         likely_text = "Likely Arduino" if score > 0 else "Unknown USB serial device"
         likely_color = "#4ade80" if score > 0 else self.TEXT_MUTED
-
-        self.port_info_label.configure(
-            text=f"{device}  \u2502  {description}  \u2502  {manufacturer}  \u2502  {likely_text}",
-            text_color=likely_color,
+        if info.get("bluetooth"):
+            likely_text = "Bluetooth serial"
+        text = (
+            f"{info['device']}  \u2502  {description}  \u2502  "
+            f"{manufacturer}  \u2502  {likely_text}"
         )
+        return text, likely_color
+
+    def _update_port_details(self):
+        entry = self._port_info_cache.get(self.port_var.get())
+        if not entry:
+            entry = ("Select a COM port to view USB details.", "#A0A0A0")
+        self._set_text(self.port_info_label, entry[0], text_color=entry[1])
 
     def _detect_arduino_port(self):
         if self.busy or self.detecting:
             return
-        if self.controller.is_connected():
-            self.status_bar.configure(
-                text=f"Already connected on {self.port_var.get()} (disconnect to scan)"
+        if self._connected:
+            self._set_text(
+                self.status_bar,
+                text=f"Already connected on {self.port_var.get()} (disconnect to scan)",
             )
             return
 
         self.detecting = True
-        self.detect_btn.configure(text="Detecting...", state="disabled")
-        self.status_bar.configure(text="Scanning COM ports for Arduino controller...")
-
-        def work():
-            details = ValveController.list_ports_with_details()
-            ranked = sorted(details, key=self._score_port, reverse=True)
-            probe_candidates = [item for item in ranked if self._score_port(item) > 0]
-            if not probe_candidates:
-                probe_candidates = ranked
-
-            for item in probe_candidates:
-                matched, response, ser = ValveController.probe_port(item["device"])
-                if matched:
-                    return {
-                        "details": details,
-                        "port": item["device"],
-                        "mode": "handshake",
-                        "response": response,
-                        "ser": ser,
-                    }
-
-            if ranked and self._score_port(ranked[0]) > 0:
+        self._set_text(self.detect_btn, "Detecting...")
+        self._set_state(self.detect_btn, "disabled")
+        include_bt = self.scan_bt_var.get()
+        # A board held open from the last Detect is locked (exclusive open);
+        # release it so this run can probe it again.
+        self._close_probed_serial()
+        self._set_text(
+            self.status_bar, text="Scanning COM ports for Arduino controller..."
+        )
+
+        self._run_async(partial(self._detect_work, include_bt), self._detect_done)
+
+    def _detect_work(self, include_bt):
+        # One budget for the sticky, solo and parallel probes together.
+        until = time.monotonic() + self.DETECT_TIMEOUT
+        details = ValveController.list_ports_with_details()
+
+        # A single port with an official Arduino VID needs no probe;
+        # opening other ports (and resetting the board) is avoided.
+        known = [item for item in details if ValveController.is_known_arduino(item)]
+        if len(known) == 1:
+            return {
+                "details": details,
+                "port": known[0]["device"],
+                "mode": "signature",
+                "response": "",
+            }
+
+        # Try the Arduino we connected to last time on its own first;
+        # on a hit no other port is opened.
+        sticky = next((item for item in details if self._is_last_arduino(item)), None)
+        if sticky:
+            matched, response, ser = ValveController.probe_port(
+                sticky["device"], until=until
+            )
+            if matched:
                 return {
                     "details": details,
-                    "port": ranked[0]["device"],
-                    "mode": "signature",
-                    "response": "",
+                    "port": sticky["device"],
+                    "mode": "handshake",
+                    "response": response,
+                    "ser": ser,
                 }
 
-            return {"details": details, "port": None, "mode": "none", "response": ""}
+        # Bluetooth serial ports can stall for seconds on open; leave them
+        # to a manual Connect unless the user asked for them.
+        scored = sorted(
+            (
+                (self._score_port(item), item)
+                for item in details
+                if include_bt or not item.get("bluetooth")
+            ),
+            key=lambda pair: pair[0],
+            reverse=True,
+        )
+        ranked = [item for _score, item in scored]
+        probe_candidates = [item for score, item in scored if score > 0]
+        if not probe_candidates:
+            # Nothing looks like an Arduino: try USB serial devices only,
+            # not the legacy /dev/ttyS* and COM1-style UARTs, and only a
+            # bounded number of them.
+            usb = [item for item in ranked if item.get("vid") is not None]
+            probe_candidates = (usb or ranked)[: self.PROBE_FALLBACK_MAX]
+        if include_bt:
+            probe_candidates += [
+                item
+                for item in ranked
+                if item.get("bluetooth") and item not in probe_candidates
+            ]
 
-        def done(result, err):
-            self.detecting = False
-            self.detect_btn.configure(text="Detect Arduino")
-            self._update_controls(connected=self.controller.is_connected())
+        candidates = [item for item in probe_candidates if item is not sticky]
+        found = None
+        if (
+            len(candidates) > 1
+            and self._score_port(candidates[0]) >= self.SOLO_PROBE_MIN_SCORE
+            and time.monotonic() < until
+        ):
+            # A strong USB match is tried on its own first; on a hit the
+            # other boards are never opened (and reset).
+            matched, response, ser = ValveController.probe_port(
+                candidates[0]["device"], until=until
+            )
+            if matched:
+                found = (candidates[0]["device"], response, ser)
+            else:
+                candidates = candidates[1:]
+        if not found and time.monotonic() < until:
+            found = ValveController.probe_ports(
+                [item["device"] for item in candidates], until=until
+            )
+        if found:
+            port, response, ser = found
+            return {
+                "details": details,
+                "port": port,
+                "mode": "handshake",
+                "response": response,
+                "ser": ser,
+            }
+
+        if scored and scored[0][0] > 0:
+            return {
+                "details": details,
+                "port": ranked[0]["device"],
+                "mode": "signature",
+                "response": "",
+            }
+
+        return {"details": details, "port": None, "mode": "none", "response": ""}
+
+    def _detect_done(self, result, err):
+        self.detecting = False
+        self._set_text(self.detect_btn, "Detect Arduino")
+        self._update_controls(connected=self._connected)
 
-            if err:
-                self.status_bar.configure(text=f"Arduino detection failed: {err}")
-                return
+        if err:
+            self._set_text(self.status_bar, text=f"Arduino detection failed: {err}")
+            return
 
-            self._close_probed_serial()
-            probed_ser = result.get("ser")
-            if probed_ser and probed_ser.is_open:
-                self._probed_serial = probed_ser
-                self._probed_port = result.get("port")
-
-            self._apply_port_details(result["details"])
-            port = result.get("port")
-            mode = result.get("mode")
-            if port:
-                self.port_var.set(port)
-                self._update_port_details()
-                if mode == "handshake":
-                    self.connected_port_label.configure(
-                        text=f"\u2714  Arduino detected on {port} (handshake verified)",
-                        text_color="#4ade80",
-                    )
-                    self.status_bar.configure(
-                        text=f"Arduino detected on {port} via serial handshake"
-                    )
-                else:
-                    self.connected_port_label.configure(
-                        text=f"\u2248  Likely Arduino on {port} (USB signature match)",
-                        text_color="#fbbf24",
-                    )
-                    self.status_bar.configure(
-                        text=f"Likely Arduino port: {port} (based on USB details)"
-                    )
+        self._close_probed_serial()
+        probed_ser = result.get("ser")
+        if probed_ser and probed_ser.is_open:
+            self._probed_serial = probed_ser
+            self._probed_port = result.get("port")
+
+        self._apply_port_details(result["details"])
+        port = result.get("port")
+        mode = result.get("mode")
+        if port:
+            self.port_var.set(port)
+            self._update_port_details()
+            if mode == "handshake":
+                self._set_text(
+                    self.connected_port_label,
+                    text=f"\u2714  Arduino detected on {port} (handshake verified)",
+                    text_color="#4ade80",
+                )
+                self._set_text(
+                    self.status_bar,
+                    text=f"Arduino detected on {port} via serial handshake",
+                )
             else:
-                self.connected_port_label.configure(
-                    text="No Arduino detected",
-                    text_color=self.TEXT_MUTED,
+                self._set_text(
+                    self.connected_port_label,
+                    text=f"\u2248  Likely Arduino on {port} (USB signature match)",
+                    text_color="#fbbf24",
                 )
-                self.status_bar.configure(
-                    text="No Arduino response detected. Verify sketch and USB cable."
+                self._set_text(
+                    self.status_bar,
+                    text=f"Likely Arduino port: {port} (based on USB details)",
                 )
+        else:
+            self._set_text(
+                self.connected_port_label,
+                text="No Arduino detected",
+                text_color=self.TEXT_MUTED,
+            )
+            self._set_text(
+                self.status_bar,
+                text="No Arduino response detected. Verify sketch and USB cable.",
+            )
+
+    # Settings
+    def _load_settings(self):
+        try:
+            with open(self.SETTINGS_PATH, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _save_settings(self):
+        try:
+            with open(self.SETTINGS_PATH, "w", encoding="utf-8") as f:
+                json.dump(self.settings, f, indent=2)
+        except OSError:
+            pass
 
-        self._run_async(work, done)
+    def _is_last_arduino(self, info):
+        """True if the port looks like the Arduino from the last connection."""
+        usb_serial = self.settings.get("usb_serial")
+        if usb_serial:
+            return info.get("serial_number") == usb_serial
+        # Adapters without a serial number: same port name and still a likely
+        # Arduino, so a reassigned COM number doesn't cost a wasted probe.
+        return (
+            info["device"] == self.settings.get("last_port")
+            and self._score_port(info) > 0
+        )
 
     # Connection handlers
     def _close_probed_serial(self):
@@ -1048,7 +1594,7 @@ class ValveApp(ctk.CTk):
     def _toggle_connection(self):
         if self.busy or self.detecting:
             return
-        if self.controller.is_connected():
+        if self._connected:
             self._do_disconnect()
         else:
             self._do_connect()
@@ -1056,7 +1602,7 @@ class ValveApp(ctk.CTk):
     def _do_connect(self):
         port = self.port_var.get()
         if not port or port == "No ports found":
-            messagebox.showwarning("No Port", "Select a COM port first.")
+            self._flash_status("Select a COM port first.")
             return
 
         probed_ser = None
@@ -1072,143 +1618,157 @@ class ValveApp(ctk.CTk):
             self._close_probed_serial()
 
         self.busy = True
-        self.connect_btn.configure(text="Connecting...", state="disabled")
-        self.status_bar.configure(text=f"Connecting to {port}...")
+        self._set_text(self.connect_btn, "Connecting...")
+        self._set_state(self.connect_btn, "disabled")
+        self._set_text(self.status_bar, text=f"Connecting to {port}...")
         self._set_buttons_enabled(False)
         self._set_sequence_controls()
 
-        def work():
-            self.controller.connect(port, existing_ser=probed_ser)
-            return self.controller.send_command("?")
-
-        def done(result, err):
-            self.busy = False
-            if err:
-                if self.controller.is_connected():
-                    try:
-                        self.controller.disconnect()
-                    except Exception:
-                        pass
-                self._update_controls(connected=False)
-                self.connected_port_label.configure(
-                    text="Not connected",
-                    text_color=self.TEXT_MUTED,
-                )
-                self.status_bar.configure(text=f"Connection failed: {err}")
-                messagebox.showerror("Connection Failed", str(err))
-                return
+        self._run_async(
+            partial(self._connect_work, port, probed_ser),
+            partial(self._connect_done, port),
+        )
 
-            self._update_controls(connected=True)
+    def _connect_work(self, port, probed_ser):
+        self.controller.connect(port, existing_ser=probed_ser)
+        return self.controller.send_command("?")
+
+    def _connect_done(self, port, result, err):
+        self.busy = False
+        if err:
+            if self.controller.is_connected():
+                # disconnect() joins the reader; keep that off the Tk thread.
+                self._run_async(self.controller.disconnect)
+            self._update_controls(connected=False)
+            self._set_text(
+                self.connected_port_label,
+                text="Not connected",
+                text_color=self.TEXT_MUTED,
+            )
+            self._set_text(self.status_bar, text=f"Connection failed: {err}")
+            messagebox.showerror("Connection Failed", str(err))
+            return
+
+        self._update_controls(connected=True)
+        state = "A"
+        if result and ":" in result:
+            state = result.partition(":")[2]
+        if state not in ("A", "B"):
             state = "A"
-            if result and ":" in result:
-                state = result.split(":")[-1]
-            if state not in ("A", "B"):
-                state = "A"
-            self.current_state = state
-            self._show_state(state)
-            self.connected_port_label.configure(
-                text=f"\u25cf  Connected on {port}",
-                text_color="#4ade80",
+        self.current_state = state
+        self._show_state(state)
+        self._set_text(
+            self.connected_port_label,
+            text=f"\u25cf  Connected on {port}",
+            text_color="#4ade80",
+        )
+        if self.controller.low_latency is False:
+            self._set_text(
+                self.status_bar,
+                text=f"Connected on {port} (could not set 1 ms latency timer; "
+                "needs write access to sysfs)",
             )
-            self.status_bar.configure(text=f"Connected on {port}")
+        else:
+            self._set_text(self.status_bar, text=f"Connected on {port}")
 
-        self._run_async(work, done)
+        info = self.port_details_by_device.get(port, {})
+        self.settings["last_port"] = port
+        self.settings["usb_serial"] = info.get("serial_number", "")
+        self._save_settings()
 
     def _do_disconnect(self):
         self.busy = True
-        self.connect_btn.configure(text="Disconnecting...", state="disabled")
-        self.status_bar.configure(text="Disconnecting...")
+        self._set_text(self.connect_btn, "Disconnecting...")
+        self._set_state(self.connect_btn, "disabled")
+        self._set_text(self.status_bar, text="Disconnecting...")
         self._set_buttons_enabled(False)
         self._set_sequence_controls()
 
-        def work():
-            self.sequence_stop_event.set()
-            if self.sequence_thread and self.sequence_thread.is_alive():
-                self.sequence_thread.join(timeout=2)
-            self.controller.disconnect()
-            return None
+        self._run_async(self._disconnect_work, self._disconnect_done)
 
-        def done(_result, _err):
-            self.busy = False
-            self.sequence_running = False
-            self.sequence_thread = None
-            self._update_controls(connected=False)
-            self._show_state(None)
-            self.connected_port_label.configure(
-                text="Not connected",
-                text_color=self.TEXT_MUTED,
-            )
-            self.sequence_status.configure(text="Sequence idle")
-            self.status_bar.configure(text="Disconnected")
+    def _disconnect_work(self):
+        self.sequence_stop_event.set()
+        if self.sequence_thread and self.sequence_thread.is_alive():
+            self.sequence_thread.join(timeout=2)
+        self.controller.disconnect()
+        return None
 
-        self._run_async(work, done)
+    def _disconnect_done(self, _result, _err):
+        self.busy = False
+        self.sequence_running = False
+        self.sequence_thread = None
+        self._update_controls(connected=False)
+        self._show_state(None)
+        self._set_text(
+            self.connected_port_label,
+            text="Not connected",
+            text_color=self.TEXT_MUTED,
+        )
+        self._set_text(self.sequence_status, text="Sequence idle")
+        self._set_text(self.status_bar, text="Disconnected")
 
     # Command handlers
     def _query_state(self):
-        if self.busy or not self.controller.is_connected() or self.sequence_running:
+        if self.busy or not self._connected or self.sequence_running:
             return
 
         self.busy = True
-        self.status_bar.configure(text="Reading current valve state...")
+        self._set_text(self.status_bar, text="Reading current valve state...")
         self._set_buttons_enabled(False)
         self._set_sequence_controls()
 
-        def work():
-            return self.controller.send_command("?")
-
-        def done(result, err):
-            self.busy = False
-            self._set_buttons_enabled(self.controller.is_connected())
-            self._set_sequence_controls()
+        self._run_async(partial(self.controller.send_command, "?"), self._query_done)
 
-            if err:
-                self.status_bar.configure(text=f"State read failed: {err}")
-                return
+    def _query_done(self, result, err):
+        self.busy = False
+        self._set_buttons_enabled(self._connected)
+        self._set_sequence_controls()
 
-            if result and result.startswith("STATE:"):
-                state = result.split(":")[1]
-                if state in ("A", "B"):
-                    self.current_state = state
-                    self._show_state(state, source="sync")
-                    self.status_bar.configure(text=f"Controller reports state {state}")
-                    return
+        if err:
+            self._set_text(self.status_bar, text=f"State read failed: {err}")
+            return
 
-            self.status_bar.configure(text=f"Unexpected response: {result}")
+        if result and result.startswith("STATE:"):
+            state = result.partition(":")[2]
+            if state in ("A", "B"):
+                self.current_state = state
+                self._show_state(state, source="sync")
+                self._set_text(
+                    self.status_bar, text=f"Controller reports state {state}"
+                )
+                return
 
-        self._run_async(work, done)
+        self._set_text(self.status_bar, text=f"Unexpected response: {result}")
 
     def _send(self, cmd):
-        if self.busy or self.sequence_running or not self.controller.is_connected():
+        if self.busy or self.sequence_running or not self._connected:
             return
 
         self.busy = True
         self._set_buttons_enabled(False)
         self._set_sequence_controls()
-        self.status_bar.configure(text=f"Sending {cmd}...")
-
-        def work():
-            return self.controller.send_command(cmd)
+        self._set_text(self.status_bar, text=f"Sending {cmd}...")
 
-        def done(result, err):
-            self.busy = False
-            self._set_buttons_enabled(self.controller.is_connected())
-            self._set_sequence_controls()
-            if err:
-                self.status_bar.configure(text=f"Command failed: {err}")
-                return
+        self._run_async(partial(self.controller.send_command, cmd), self._send_done)
 
-            if result and result.startswith("OK:"):
-                state = result.split(":")[1]
-                if state in ("A", "B"):
-                    self.current_state = state
-                    self._show_state(state, source="ui")
-                self.status_bar.configure(text=f"Valve set to {state}")
-            elif result and result.startswith("ERR:"):
-                self.status_bar.configure(text=f"Arduino error: {result}")
-            else:
-                self.status_bar.configure(text=f"Unexpected response: {result}")
+    def _send_done(self, result, err):
+        self.busy = False
+        self._set_buttons_enabled(self._connected)
+        self._set_sequence_controls()
+        if err:
+            self._set_text(self.status_bar, text=f"Command failed: {err}")
+            return
 
-        self._run_async(work, done)
+        if result and result.startswith("OK:"):
+            state = result.partition(":")[2]
+            if state in ("A", "B"):
+                self.current_state = state
+                self._show_state(state, source="ui")
+            self._set_text(self.status_bar, text=f"Valve set to {state}")
+        elif result and result.startswith("ERR:"):
+            self._set_text(self.status_bar, text=f"Arduino error: {result}")
+        else:
+            self._set_text(self.status_bar, text=f"Unexpected response: {result}")
 
     # Sequence builder
     def _parse_sequence_duration(self):
@@ -1216,18 +1776,19 @@ class ValveApp(ctk.CTk):
         try:
             duration = float(raw_duration)
         except ValueError:
-            messagebox.showwarning(
-                "Invalid Duration", "Duration must be a number in seconds."
-            )
+            self._flash_status("Duration must be a number in seconds.")
             return None
 
         if duration < 0.05 or duration > 120:
-            messagebox.showwarning(
-                "Invalid Duration", "Use a duration between 0.05 and 120 seconds."
-            )
+            self._flash_status("Use a duration between 0.05 and 120 seconds.")
             return None
         return duration
 
+    @staticmethod
+    def _make_step(state, duration):
+        # The table text is formatted once here, not on every refresh.
+        return {"state": state, "duration": duration, "_dur_str": f"{duration:.2f}"}
+
     def _add_sequence_step(self):
         if self.sequence_running:
             return
@@ -1235,15 +1796,16 @@ class ValveApp(ctk.CTk):
         duration = self._parse_sequence_duration()
         if duration is None:
             return
-        self.sequence_steps.append({"state": state, "duration": duration})
-        self._refresh_sequence_table()
+        self.sequence_steps.append(self._make_step(state, duration))
+        self._refresh_sequence_table(len(self.sequence_steps) - 1)
         items = self.seq_table.get_children()
         if items:
             self.seq_table.selection_set(items[-1])
             self.seq_table.see(items[-1])
         self._set_sequence_controls()
-        self.sequence_status.configure(
-            text=f"Added step {len(self.sequence_steps)}: {state} for {duration:.2f}s"
+        self._set_text(
+            self.sequence_status,
+            text=f"Added step {len(self.sequence_steps)}: {state} for {duration:.2f}s",
         )
 
     def _edit_selected_step(self):
@@ -1251,19 +1813,23 @@ class ValveApp(ctk.CTk):
             return
         sel = self.seq_table.selection()
         if not sel:
-            messagebox.showinfo("No Selection", "Select a step to edit first.")
+            self._flash_status("Select a step to edit first.")
             return
         idx = self.seq_table.index(sel[0])
         duration = self._parse_sequence_duration()
         if duration is None:
             return
         state = self.seq_state_var.get()
-        self.sequence_steps[idx] = {"state": state, "duration": duration}
-        self._refresh_sequence_table()
+        step = self.sequence_steps[idx]
+        step["state"] = state
+        step["duration"] = duration
+        step["_dur_str"] = f"{duration:.2f}"
+        self._refresh_sequence_table(idx)
         items = self.seq_table.get_children()
         self.seq_table.selection_set(items[idx])
-        self.sequence_status.configure(
-            text=f"Updated step {idx + 1} to {state} for {duration:.2f}s"
+        self._set_text(
+            self.sequence_status,
+            text=f"Updated step {idx + 1} to {state} for {duration:.2f}s",
         )
 
     def _remove_sequence_step(self):
@@ -1275,14 +1841,15 @@ class ValveApp(ctk.CTk):
         else:
             idx = len(self.sequence_steps) - 1
         removed = self.sequence_steps.pop(idx)
-        self._refresh_sequence_table()
+        self._refresh_sequence_table(idx)
         items = self.seq_table.get_children()
         if items:
             new_idx = min(idx, len(items) - 1)
             self.seq_table.selection_set(items[new_idx])
         self._set_sequence_controls()
-        self.sequence_status.configure(
-            text=f"Removed step: {removed['state']} for {removed['duration']:.2f}s"
+        self._set_text(
+            self.sequence_status,
+            text=f"Removed step: {removed['state']} for {removed['_dur_str']}s",
         )
 
     def _move_step_up(self):
@@ -1298,7 +1865,7 @@ class ValveApp(ctk.CTk):
             self.sequence_steps[idx],
             self.sequence_steps[idx - 1],
         )
-        self._refresh_sequence_table()
+        self._refresh_sequence_table(idx - 1)
         items = self.seq_table.get_children()
         self.seq_table.selection_set(items[idx - 1])
         self.seq_table.see(items[idx - 1])
@@ -1316,7 +1883,7 @@ class ValveApp(ctk.CTk):
             self.sequence_steps[idx + 1],
             self.sequence_steps[idx],
         )
-        self._refresh_sequence_table()
+        self._refresh_sequence_table(idx)
         items = self.seq_table.get_children()
         self.seq_table.selection_set(items[idx + 1])
         self.seq_table.see(items[idx + 1])
@@ -1327,32 +1894,43 @@ class ValveApp(ctk.CTk):
         self.sequence_steps.clear()
         self._refresh_sequence_table()
         self._set_sequence_controls()
-        self.sequence_status.configure(text="Sequence cleared")
+        self._set_text(self.sequence_status, text="Sequence cleared")
 
     def _load_demo_sequence(self):
         if self.sequence_running:
             return
         self.sequence_steps = [
-            {"state": "A", "duration": 1.0},
-            {"state": "B", "duration": 1.0},
-            {"state": "A", "duration": 0.5},
-            {"state": "B", "duration": 0.5},
+            self._make_step("A", 1.0),
+            self._make_step("B", 1.0),
+            self._make_step("A", 0.5),
+            self._make_step("B", 0.5),
         ]
         self._refresh_sequence_table()
         self._set_sequence_controls()
-        self.sequence_status.configure(text="Loaded demo sequence (4 steps)")
-
-    def _refresh_sequence_table(self):
-        for item in self.seq_table.get_children():
-            self.seq_table.delete(item)
-        for i, step in enumerate(self.sequence_steps):
-            tag = f"state_{step['state']}"
-            self.seq_table.insert(
-                "",
-                "end",
-                values=(i + 1, step["state"], f"{step['duration']:.2f}"),
-                tags=(tag,),
+        self._set_text(self.sequence_status, text="Loaded demo sequence (4 steps)")
+
+    def _refresh_sequence_table(self, start=0):
+        # Reuse existing rows and only touch the ones whose contents changed;
+        # every Treeview call is a Tcl round-trip and may trigger a relayout.
+        # Rows before ``start`` are known to be unchanged and are not rebuilt.
+        items = self.seq_table.get_children()
+        rows = self._seq_rows[:start]
+        rows.extend(
+            (
+                (i + 1, step["state"], step["_dur_str"]),
+                (f"state_{step['state']}",),
             )
+            for i, step in enumerate(self.sequence_steps[start:], start=start)
+        )
+        for i in range(start, len(rows)):
+            values, tags = rows[i]
+            if i >= len(items):
+                self.seq_table.insert("", "end", values=values, tags=tags)
+            elif i >= len(self._seq_rows) or self._seq_rows[i] != rows[i]:
+                self.seq_table.item(items[i], values=values, tags=tags)
+        if len(items) > len(rows):
+            self.seq_table.delete(*items[len(rows) :])
+        self._seq_rows = rows
 
     def _on_table_select(self, _event=None):
         sel = self.seq_table.selection()
@@ -1362,28 +1940,30 @@ class ValveApp(ctk.CTk):
         if 0 <= idx < len(self.sequence_steps):
             step = self.sequence_steps[idx]
             self.seq_state_var.set(step["state"])
-            self.seq_duration_var.set(f"{step['duration']:.2f}")
+            self.seq_duration_var.set(step["_dur_str"])
 
     def _start_sequence(self, loop_mode):
         if self.busy or self.detecting or self.sequence_running:
             return
-        if not self.controller.is_connected():
-            messagebox.showwarning(
-                "Not Connected", "Connect to Arduino before running a sequence."
-            )
+        if not self._connected:
+            self._flash_status("Connect to Arduino before running a sequence.")
             return
         if not self.sequence_steps:
-            messagebox.showwarning("No Steps", "Add at least one sequence step first.")
+            self._flash_status("Add at least one sequence step first.")
             return
 
-        steps = [dict(step) for step in self.sequence_steps]
+        # Immutable snapshot: the worker never sees later edits to the dicts.
+        steps = [
+            (step["state"], float(step["duration"])) for step in self.sequence_steps
+        ]
         self.sequence_total_steps = len(steps)
         self.sequence_running = True
         self.sequence_stop_event.clear()
+        self._sequence_interrupted = False
 
         mode_text = "looping" if loop_mode else "single run"
-        self.sequence_status.configure(text=f"Sequence started ({mode_text})")
-        self.status_bar.configure(text=f"Running sequence ({mode_text})...")
+        self._set_text(self.sequence_status, text=f"Sequence started ({mode_text})")
+        self._set_text(self.status_bar, text=f"Running sequence ({mode_text})...")
         self._set_buttons_enabled(False)
         self._set_sequence_controls()
 
@@ -1402,26 +1982,24 @@ class ValveApp(ctk.CTk):
         try:
             while not self.sequence_stop_event.is_set():
                 loops += 1
-                for step_index, step in enumerate(steps, start=1):
+                for step_index, (state, duration) in enumerate(steps, start=1):
                     if self.sequence_stop_event.is_set():
                         break
 
-                    result = self.controller.send_command(step["state"])
+                    # The serial round-trip counts towards the step, so short
+                    # steps aren't stretched; only the acknowledged state is
+                    # shown.
+                    started = time.monotonic()
+                    result = self.controller.send_command(state)
                     if not result or not result.startswith("OK:"):
                         raise RuntimeError(f"Unexpected response: {result}")
-
-                    state = result.split(":")[1]
-                    duration = step["duration"]
-                    self.result_queue.put(
-                        lambda s=state, i=step_index, d=duration, l=loops: (
-                            self._on_sequence_step(s, i, d, l)
-                        )
+                    acked = result.partition(":")[2]
+                    self._post(
+                        self._on_sequence_step, acked, step_index, duration, loops
                     )
-
-                    start = time.time()
-                    while time.time() - start < duration:
-                        if self.sequence_stop_event.wait(0.05):
-                            break
+                    remaining = duration - (time.monotonic() - started)
+                    if remaining > 0 and self.sequence_stop_event.wait(remaining):
+                        break
 
                 if not loop_mode:
                     break
@@ -1430,136 +2008,192 @@ class ValveApp(ctk.CTk):
         except Exception as exc:
             error = exc
         finally:
-            self.result_queue.put(
-                lambda err=error, count=loops, was_stopped=stopped, is_loop=loop_mode: (
-                    self._finish_sequence(err, count, was_stopped, is_loop)
-                )
-            )
+            self._post(self._finish_sequence, error, loops, stopped, loop_mode)
 
     def _on_sequence_step(self, state, step_index, duration, loop_count):
+        # Short steps can arrive faster than they can be read; paint the first
+        # at once, then at most the latest one every STEP_RENDER_MS.
         self.current_state = state
+        self._pending_step = (state, step_index, duration, loop_count)
+        if self._step_render_job is None:
+            self._render_sequence_step()
+
+    def _render_sequence_step(self):
+        step = self._pending_step
+        if step is None:
+            self._step_render_job = None
+            return
+        self._pending_step = None
+        self._paint_sequence_step(*step)
+        self._step_render_job = self.after(
+            self.STEP_RENDER_MS, self._render_sequence_step
+        )
+
+    def _flush_sequence_step(self):
+        if self._step_render_job is not None:
+            self.after_cancel(self._step_render_job)
+            self._step_render_job = None
+        if self._pending_step is not None:
+            self._paint_sequence_step(*self._pending_step)
+            self._pending_step = None
+
+    def _drop_sequence_step(self):
+        if self._step_render_job is not None:
+            self.after_cancel(self._step_render_job)
+            self._step_render_job = None
+        self._pending_step = None
+
+    def _paint_sequence_step(self, state, step_index, duration, loop_count):
         self._show_state(state, source="sequence")
-        self.sequence_status.configure(
+        self._set_text(
+            self.sequence_status,
             text=(
                 f"Loop {loop_count} | Step {step_index}/{self.sequence_total_steps}: "
                 f"{state} for {duration:.2f}s"
-            )
+            ),
         )
-        self.status_bar.configure(
-            text=f"Sequence running: loop {loop_count}, step {step_index}/{self.sequence_total_steps}"
+        self._set_text(
+            self.status_bar,
+            text=f"Sequence running: loop {loop_count}, step {step_index}/{self.sequence_total_steps}",
         )
 
     def _finish_sequence(self, error, loops, was_stopped, is_loop):
+        if self._sequence_interrupted:
+            self._drop_sequence_step()
+        else:
+            self._flush_sequence_step()
         self.sequence_running = False
         self.sequence_thread = None
-        self._set_buttons_enabled(self.controller.is_connected() and not self.busy)
+        self._set_buttons_enabled(self._connected and not self.busy)
         self._set_sequence_controls()
 
-        if not self.controller.is_connected():
-            self.sequence_status.configure(text="Sequence idle")
+        if not self._connected:
+            self._set_text(self.sequence_status, text="Sequence idle")
             return
 
         if error:
-            self.sequence_status.configure(text=f"Sequence error: {error}")
-            self.status_bar.configure(text=f"Sequence error: {error}")
+            if isinstance(error, OSError) and not isinstance(error, TimeoutError):
+                # The port failed (SerialException, ConnectionError); a single
+                # slow reply (TimeoutError) keeps the link.
+                self._run_async(self.controller.disconnect)
+                self._update_controls(connected=False)
+                self._show_state(None)
+                self._set_text(
+                    self.connected_port_label,
+                    text="Connection lost",
+                    text_color=self.TEXT_MUTED,
+                )
+            self._set_text(self.sequence_status, text=f"Sequence error: {error}")
+            self._set_text(self.status_bar, text=f"Sequence error: {error}")
             return
 
         if was_stopped:
-            self.sequence_status.configure(text="Sequence stopped")
-            self.status_bar.configure(text="Sequence stopped")
+            self._set_text(self.sequence_status, text="Sequence stopped")
+            self._set_text(self.status_bar, text="Sequence stopped")
             return
 
         loop_word = "cycle" if loops == 1 else "cycles"
         mode = "loop run" if is_loop else "single run"
-        self.sequence_status.configure(
-            text=f"Sequence completed ({loops} {loop_word}, {mode})"
+        self._set_text(
+            self.sequence_status,
+            text=f"Sequence completed ({loops} {loop_word}, {mode})",
+        )
+        self._set_text(
+            self.status_bar, text=f"Sequence completed ({loops} {loop_word})"
         )
-        self.status_bar.configure(text=f"Sequence completed ({loops} {loop_word})")
 
     def _stop_sequence(self):
         if not self.sequence_running:
             return
         self.sequence_stop_event.set()
-        self.sequence_status.configure(text="Stopping sequence...")
-        self.status_bar.configure(text="Stopping sequence...")
+        self._flush_sequence_step()
+        self._set_text(self.sequence_status, text="Stopping sequence...")
+        self._set_text(self.status_bar, text="Stopping sequence...")
         self._set_sequence_controls()
 
     # UI helpers
     def _update_controls(self, connected):
+        # Every connect/disconnect transition lands here, so this flag is the
+        # UI's view of the link; only connection teardown asks the controller.
+        self._connected = connected
         self._set_buttons_enabled(connected and not self.busy)
 
+        self._set_state(self.connect_btn, "disabled" if self.busy else "normal")
         if connected:
-            self.connect_btn.configure(
-                text="Disconnect",
-                state="normal" if not self.busy else "disabled",
+            self._set_text(
+                self.connect_btn,
+                "Disconnect",
                 fg_color="#991b1b",
                 hover_color="#b91c1c",
                 text_color="#fecaca",
             )
-            self.port_menu.configure(state="disabled")
-            self.refresh_btn.configure(state="disabled")
-            self.detect_btn.configure(state="disabled")
+            self._set_state(self.port_menu, "disabled")
+            self._set_state(self.refresh_btn, "disabled")
+            self._set_state(self.detect_btn, "disabled")
         else:
-            self.connect_btn.configure(
-                text="Connect",
-                state="normal" if not self.busy else "disabled",
+            self._set_text(
+                self.connect_btn,
+                "Connect",
                 fg_color="#166534",
                 hover_color="#15803d",
                 text_color="#bbf7d0",
             )
-            self.port_menu.configure(state="normal")
-            self.refresh_btn.configure(state="normal")
-            if self.detecting:
-                self.detect_btn.configure(state="disabled")
-            else:
-                self.detect_btn.configure(state="normal")
+            self._set_state(self.port_menu, "normal")
+            self._set_state(
+                self.refresh_btn, "disabled" if self.refreshing else "normal"
+            )
+            self._set_state(self.detect_btn, "disabled" if self.detecting else "normal")
 
         self._set_sequence_controls()
 
     def _set_buttons_enabled(self, enabled):
         state = "normal" if enabled and not self.sequence_running else "disabled"
-        self.btn_a.configure(state=state)
-        self.btn_b.configure(state=state)
-        self.read_state_btn.configure(state=state)
+        self._set_state(self.btn_a, state)
+        self._set_state(self.btn_b, state)
+        self._set_state(self.read_state_btn, state)
 
     def _set_sequence_controls(self):
-        connected = self.controller.is_connected()
+        connected = self._connected
         has_steps = bool(self.sequence_steps)
         editable = not self.sequence_running
 
         edit_state = "normal" if editable else "disabled"
-        self.seq_state_menu.configure(state=edit_state)
-        self.seq_duration_entry.configure(state=edit_state)
-        self.seq_add_btn.configure(state=edit_state)
-        self.seq_edit_btn.configure(state=edit_state)
-        self.seq_remove_btn.configure(state=edit_state)
-        self.seq_clear_btn.configure(state=edit_state)
-        self.seq_demo_btn.configure(state=edit_state)
-        self.seq_up_btn.configure(state=edit_state)
-        self.seq_down_btn.configure(state=edit_state)
+        for widget in (
+            self.seq_state_menu,
+            self.seq_duration_entry,
+            self.seq_add_btn,
+            self.seq_edit_btn,
+            self.seq_remove_btn,
+            self.seq_clear_btn,
+            self.seq_demo_btn,
+            self.seq_up_btn,
+            self.seq_down_btn,
+        ):
+            self._set_state(widget, edit_state)
 
         run_enabled = connected and has_steps and not self.busy and not self.detecting
-        self.seq_run_once_btn.configure(state="normal" if run_enabled else "disabled")
-        self.seq_run_loop_btn.configure(state="normal" if run_enabled else "disabled")
-        self.seq_stop_btn.configure(
-            state="normal" if self.sequence_running else "disabled"
+        run_state = "normal" if run_enabled else "disabled"
+        self._set_state(self.seq_run_once_btn, run_state)
+        self._set_state(self.seq_run_loop_btn, run_state)
+        self._set_state(
+            self.seq_stop_btn, "normal" if self.sequence_running else "disabled"
         )
 
     def _bind_zoom_shortcuts(self):
-        self.bind_all("<Control-plus>", lambda _event: self._zoom_in(), add="+")
-        self.bind_all("<Control-equal>", lambda _event: self._zoom_in(), add="+")
-        self.bind_all("<Control-KP_Add>", lambda _event: self._zoom_in(), add="+")
-        self.bind_all("<Control-minus>", lambda _event: self._zoom_out(), add="+")
-        self.bind_all("<Control-KP_Subtract>", lambda _event: self._zoom_out(), add="+")
-        self.bind_all("<Control-0>", lambda _event: self._zoom_reset(), add="+")
-
-    def _zoom_in(self):
+        self.bind_all("<Control-plus>", self._zoom_in, add="+")
+        self.bind_all("<Control-equal>", self._zoom_in, add="+")
+        self.bind_all("<Control-KP_Add>", self._zoom_in, add="+")
+        self.bind_all("<Control-minus>", self._zoom_out, add="+")
+        self.bind_all("<Control-KP_Subtract>", self._zoom_out, add="+")
+        self.bind_all("<Control-0>", self._zoom_reset, add="+")
+
+    def _zoom_in(self, _event=None):
         self._set_manual_zoom(self._manual_zoom + self.USER_ZOOM_STEP)
 
-    def _zoom_out(self):
+    def _zoom_out(self, _event=None):
         self._set_manual_zoom(self._manual_zoom - self.USER_ZOOM_STEP)
 
-    def _zoom_reset(self):
+    def _zoom_reset(self, _event=None):
         self._set_manual_zoom(1.0)
 
     def _set_manual_zoom(self, value):
@@ -1567,26 +2201,56 @@ class ValveApp(ctk.CTk):
         if abs(clamped - self._manual_zoom) < 0.001:
             return
         self._manual_zoom = clamped
-        self._apply_ui_scaling(force=True)
-        self.status_bar.configure(
-            text=f"Zoom set to {int(round(self._manual_zoom * 100))}%"
+        self._refresh_zoom_label()
+        # Rescaling walks every widget; a held Ctrl++ applies once at the end.
+        if self._zoom_job is not None:
+            self.after_cancel(self._zoom_job)
+        self._zoom_job = self.after(80, self._commit_zoom)
+        self._set_text(
+            self.status_bar, text=f"Zoom set to {int(round(self._manual_zoom * 100))}%"
         )
 
+    def _commit_zoom(self):
+        self._zoom_job = None
+        self._apply_ui_scaling(force=True)
+
     def _refresh_zoom_label(self):
-        if hasattr(self, "zoom_label"):
-            self.zoom_label.configure(text=f"{int(round(self._manual_zoom * 100))}%")
+        if self.zoom_label is not None:
+            self._set_text(self.zoom_label, f"{int(round(self._manual_zoom * 100))}%")
 
     def _on_window_resize(self, event):
         if event.widget is not self:
             return
-        if self._resize_job is not None:
-            self.after_cancel(self._resize_job)
-        self._resize_job = self.after(120, self._apply_ui_scaling)
-
-    def _apply_ui_scaling(self, force=False):
+        # Moves and nested layout passes report the same size; don't even
+        # restart the debounce timer for those.
+        size = (event.width, event.height)
+        if size == self._last_resize_wh and self._resize_job is None:
+            return
+        # A drag fires dozens of events a second: push the deadline out
+        # rather than cancelling and re-creating the Tk timer each time.
+        self._resize_wh = size
+        self._resize_deadline = time.monotonic() + 0.12
+        if self._resize_job is None:
+            self._resize_job = self.after(120, self._on_resize_settled)
+
+    def _on_resize_settled(self):
+        remaining = self._resize_deadline - time.monotonic()
+        if remaining > 0.005:
+            self._resize_job = self.after(
+                int(remaining * 1000) + 1, self._on_resize_settled
+            )
+            return
         self._resize_job = None
-        width = max(self.winfo_width(), 1)
-        height = max(self.winfo_height(), 1)
+        self._apply_ui_scaling(size=self._resize_wh)
+
+    def _apply_ui_scaling(self, force=False, size=None):
+        if size is None:
+            size = (self.winfo_width(), self.winfo_height())
+        width = max(size[0], 1)
+        height = max(size[1], 1)
+        if not force and (width, height) == self._last_resize_wh:
+            return
+        self._last_resize_wh = (width, height)
 
         width_scale = width / self.BASE_WIDTH
         height_scale = height / self.BASE_HEIGHT
@@ -1600,7 +2264,6 @@ class ValveApp(ctk.CTk):
         if force or abs(target_scale - self._ui_scale) >= 0.02:
             self._ui_scale = target_scale
             ctk.set_widget_scaling(self._ui_scale)
-            self._refresh_zoom_label()
 
     def _on_page_mousewheel(self, event):
         ctrl_pressed = bool(event.state & 0x0004)
@@ -1611,7 +2274,7 @@ class ValveApp(ctk.CTk):
                 self._zoom_out()
             return "break"
 
-        if hasattr(self, "seq_table") and event.widget is self.seq_table:
+        if self.seq_table is not None and event.widget is self.seq_table:
             return None
 
         units = 0
@@ -1623,41 +2286,58 @@ class ValveApp(ctk.CTk):
             return self._scroll_page(units)
         return None
 
+    def _on_page_scroll_up(self, _event=None):
+        return self._scroll_page(-1)
+
+    def _on_page_scroll_down(self, _event=None):
+        return self._scroll_page(1)
+
     def _scroll_page(self, units):
-        if hasattr(self, "page") and hasattr(self.page, "_parent_canvas"):
-            self.page._parent_canvas.yview_scroll(units, "units")
+        if self._page_canvas is not None:
+            self._page_canvas.yview_scroll(units, "units")
             return "break"
         return None
 
     def _show_state(self, state, source=None):
+        # Repeated presses of the same button repaint nothing.
+        if (state, source) == self._last_state_display:
+            return
+        self._last_state_display = (state, source)
+
         if state is None:
             self.state_banner.configure(fg_color=self.BANNER_OFF_BG)
-            self.state_label.configure(text="DISCONNECTED", text_color=self.TEXT_MUTED)
-            self.state_detail.configure(text="Select a COM port and connect")
-            self.source_label.configure(text="")
+            self._set_text(
+                self.state_label, text="DISCONNECTED", text_color=self.TEXT_MUTED
+            )
+            self._set_text(self.state_detail, text="Select a COM port and connect")
+            self._set_text(self.source_label, text="")
             return
 
         bg = self.STATE_BANNER_BG.get(state, self.BANNER_OFF_BG)
         self.state_banner.configure(fg_color=bg)
 
-        names = {"A": "POSITION A", "B": "POSITION B"}
-        color = self.STATE_COLORS.get(state, self.TEXT_MUTED)
-        self.state_label.configure(text=names.get(state, state), text_color=color)
-        self.state_detail.configure(text=self._get_state_label(state))
+        view = self.STATE_VIEW.get(state)
+        name, color = view if view else (state, self.TEXT_MUTED)
+        self._set_text(self.state_label, text=name, text_color=color)
+        self._set_text(self.state_detail, text=self._get_state_label(state))
 
-        source_text = {
-            "button": "Changed via hardware buttons",
-            "ui": "Changed via UI",
-            "sequence": "Changed via sequence",
-            "sync": "Synced from controller",
-        }
-        self.source_label.configure(text=source_text.get(source, ""))
+        self._set_text(self.source_label, text=self.SOURCE_LABELS.get(source, ""))
 
     def on_close(self):
+        if self._closing:
+            return
+        self._closing = True
         self._close_probed_serial()
         self.sequence_stop_event.set()
-        if self.sequence_thread and self.sequence_thread.is_alive():
-            self.sequence_thread.join(timeout=1.5)
+        self._poll_close()
+
+    def _poll_close(self, attempts=30):
+        # Give a running sequence up to ~1.5 s to finish its step while the
+        # window keeps repainting, instead of blocking in join().
+        thread = self.sequence_thread
+        if thread and thread.is_alive() and attempts > 0:
+            self.after(50, self._poll_close, attempts - 1)
+            return
         if self.controller.is_connected():
             try:
                 self.controller.disconnect()